@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import streamlit as st
 import project_functions as pf
@@ -7,21 +8,13 @@ pd.set_option("display.max_columns", None)  # show all columns
 pd.set_option("display.width", None)        # don't cut lines
 pd.set_option("display.max_colwidth", None) # show all fields
 
-df_crypto = pd.read_csv('cryptocurrency.csv')
-df_stocks = pd.read_csv('stocks.csv')
-# print(df_crypto.shape)
-df_crypto['timestamp'] = pf.transform_string_to_datetime(df_crypto['timestamp'])
-
-df_crypto['price_usd_num'] = pf.transform_string_to_num(df_crypto['price_usd'])
+CRYPTO_CSV = 'cryptocurrency.csv'
+crypto_mtime = os.path.getmtime(CRYPTO_CSV)
 
-df_crypto['vol_24h_num'] = pf.transform_dollars_str_to_num(df_crypto['vol_24h'])
-df_crypto['market_cap_num'] = pf.transform_dollars_str_to_num(df_crypto['market_cap'])
-
-df_crypto['total_vol_num'] = pf.transform_percent_str_to_num(df_crypto['total_vol'])
-df_crypto['chg_24h_num'] = pf.transform_percent_str_to_num(df_crypto['chg_24h'])
-df_crypto['chg_7d_num'] = pf.transform_percent_str_to_num(df_crypto['chg_7d'])
-na_list = ['name','price_usd_num', 'vol_24h_num', 'market_cap_num', 'total_vol_num', 'chg_24h_num', 'chg_7d_num']
-df_crypto = pf.drop_na_line(df_crypto, *na_list)
+df_crypto = pf.load_crypto_data(CRYPTO_CSV, crypto_mtime)   # cached, parsed only once
+df_crypto_by_name = pf.load_crypto_by_name(CRYPTO_CSV, crypto_mtime)   # cached, indexed by name for plots and crypto info
+kpi_stats = pf.load_kpi_stats(CRYPTO_CSV, crypto_mtime)    # cached values for KPI cards
+# print(df_crypto.shape)
 
 #------------------------------------define time start and end#------------------------------------
 max_date = df_crypto['timestamp'].max().date()
@@ -31,22 +24,22 @@ min_date = df_crypto['timestamp'].min().date()
 st.title("Cryptocurrency Market Insights")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    pf.card_info(df_crypto)
+    pf.card_info(kpi_stats)
 with col2:
-    pf.total_market_cap(df_crypto)
+    pf.total_market_cap(kpi_stats)
 with col3:
-    pf.max_market_cap(df_crypto)
+    pf.max_market_cap(kpi_stats)
 with col4:
-    pf.most_expensive_crypto(df_crypto)
+    pf.most_expensive_crypto(kpi_stats)
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    pf.top_gainer_24h(df_crypto)
+    pf.top_gainer_24h(kpi_stats)
 with col2:
-    pf.top_loser_24h(df_crypto)
+    pf.top_loser_24h(kpi_stats)
 with col3:
-    pf.top_gainer_7d(df_crypto)
+    pf.top_gainer_7d(kpi_stats)
 with col4:
-    pf.top_loser_7d(df_crypto)
+    pf.top_loser_7d(kpi_stats)
 
 
 #---------------------Get info about top 10 crypto BLOCK-------------------
@@ -60,8 +53,8 @@ top_n = st.selectbox("Choose Top N", options=["5", "10"])
 bitcoin = st.checkbox("Exclude Top 1")
 action_top = st.selectbox("Choose parameter", options=action_options_list)
 if st.button("Get Info about TOP"):
-    top_crypto_list = pf.get_top_crypto_list(df_crypto, int(top_n), column_library[action_top], bitcoin)
-    pf.plot_crypto_field(df_crypto, min_date, max_date, *top_crypto_list, field=column_library[action_top], f_name=action_top)
+    top_crypto_list = pf.load_top_crypto_list(CRYPTO_CSV, crypto_mtime, int(top_n), column_library[action_top], bitcoin)
+    pf.plot_crypto_field(df_crypto_by_name, min_date, max_date, *top_crypto_list, field=column_library[action_top], f_name=action_top)
 
 
 #---------------------Get info about crypto BLOCK-------------------
@@ -84,11 +77,11 @@ else:
 
 if action == "Get main info":
     if st.button("Get Info"):
-        pf.get_crypto_main_info(df_crypto, option_cripto_name, start_date, end_date)
+        pf.get_crypto_main_info(df_crypto_by_name, option_cripto_name, start_date, end_date)
 
 if action == "Plot":
     if st.button("Get Info"):
-        pf.plot_crypto_field(df_crypto, start_date, end_date, option_cripto_name)
+        pf.plot_crypto_field(df_crypto_by_name, start_date, end_date, option_cripto_name)
 
 
 #print(df_crypto.head())
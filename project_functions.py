@@ -4,15 +4,11 @@ from matplotlib.container import BarContainer
 import streamlit as st
 import seaborn as sns
 import math
+import io
+import threading
 from functools import wraps
 from datetime import datetime
 
-def transform_string_to_datetime(sr: pd.Series) -> pd.Series:
-    """
-    Transform sr (df_crypto['timestamp']) from string into datetime
-    """
-    return pd.to_datetime(sr.astype(str))
-
 def transform_string_to_num(sr: pd.Series) -> pd.Series:
     """
     Transform sr (df_crypto['price_usd']) from string into numbers
@@ -21,13 +17,14 @@ def transform_string_to_num(sr: pd.Series) -> pd.Series:
     :returns: pd.Series
     example: 1,234.56 -> 1234.56
     """
-    return pd.to_numeric(sr.astype(str).str.replace(',', ''), errors='coerce')
+    return pd.to_numeric(sr.astype(str).str.replace(',', '', regex=False), errors='coerce')
 
 def transform_dollars_str_to_num(sr: pd.Series) -> pd.Series:
     """
         Transforms sr (df_crypto['vol_24h'] and df_crypto['market_cap']) from string into numbers
         delete unnecessary symbols - $ from the left, B, M, K from the end
         (and multiply on e+9, E+6, e+3)
+        sign (-$1.5B, $-1.5B), spaces around and exponent ($1e3) are allowed
         may be NaNs, if value does not much the format
         :param sr: pd.Series
         :returns: pd.Series
@@ -35,13 +32,14 @@ def transform_dollars_str_to_num(sr: pd.Series) -> pd.Series:
                  $171.53M -> 171530000
                  $1.64K -> 1640
     """
-    num = sr.astype(str).str.replace('$', '', regex=False)  # remove symbol $
-
-    factor = num.str[-1].map({'T': 1e12, 'B': 1e9, 'M': 1e6, 'K': 1e3}) # suffix (T, B, M, K) to factor
+    # one regex pass: group 0 - sign before $, group 1 - number without $ and suffix (may have sign / exponent),
+    # group 2 - suffix (T, B, M, K) or ''
+    parts = sr.astype(str).str.extract(r'^\s*([-+]?)\$?\s*([-+]?[\d,.]+(?:[eE][-+]?\d+)?)\s*([TBMK]?)\s*$')
 
-    pure_num = num.str[:-1].where(num.str[-1].isin(['T', 'B', 'M', 'K']), num)   #number without a suffix, if there is
+    num = pd.to_numeric((parts[0] + parts[1]).str.replace(',', '', regex=False), errors='coerce')
+    factor = parts[2].map({'T': 1e12, 'B': 1e9, 'M': 1e6, 'K': 1e3})  # suffix to factor
 
-    return pd.to_numeric(pure_num.str.replace(',', ''), errors='coerce') * factor.fillna(1)
+    return num * factor.fillna(1)
 
 
 def transform_percent_str_to_num(sr: pd.Series) -> pd.Series:
@@ -53,21 +51,81 @@ def transform_percent_str_to_num(sr: pd.Series) -> pd.Series:
         :returns: array
         example: 17% -> 17, -1.66% ->-1.66
     """
-    return pd.to_numeric(
-        sr.astype(str)
-        .str.replace('%', '', regex=False)
-        .str.replace('+', '', regex=False),
-        errors='coerce'
-    )
+    return pd.to_numeric(sr.astype(str).str.replace(r'[%+]', '', regex=True), errors='coerce')
 
 
 def drop_na_line(df: pd.DataFrame, *columns) -> pd.DataFrame:
     """
     Deletes from dataframe lines, for which the value of column is NaN
     """
-    for col in columns:
-        df = df.dropna(subset=[col])
-    return df
+    return df.dropna(subset=list(columns))
+
+
+@st.cache_resource
+def load_crypto_data(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Reads the crypto csv and adds the parsed number columns
+    (price_usd_num, vol_24h_num, market_cap_num, total_vol_num, chg_24h_num, chg_7d_num),
+    drops lines with NaN in them and the raw string columns, stores name and symbol as category.
+    Cached by Streamlit as a resource, so the csv is parsed once and reruns get the same
+    object without copying it - the dataframe is shared, don't modify it.
+    :param path: path to csv file
+    :param mtime: modification time of the file, used only as a cache key (new file -> new parse)
+    :returns: pd.DataFrame
+    """
+    # timestamp is parsed and name, symbol are made category while reading
+    # price_usd is read as str: csv has broken lines (e.g. '$14.54B' in price_usd),
+    # so thousands=',' / float dtype can't be used and float guessing per chunk is useless
+    df = pd.read_csv(path, parse_dates=['timestamp'],
+                     dtype={'name': 'category', 'symbol': 'category', 'price_usd': str})
+    # read_csv silently leaves bad timestamps as strings, to_datetime raises on them (no-op if already parsed)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    df['price_usd_num'] = transform_string_to_num(df['price_usd'])
+
+    df['vol_24h_num'] = transform_dollars_str_to_num(df['vol_24h'])
+    df['market_cap_num'] = transform_dollars_str_to_num(df['market_cap'])
+
+    df['total_vol_num'] = transform_percent_str_to_num(df['total_vol'])
+    df['chg_24h_num'] = transform_percent_str_to_num(df['chg_24h'])
+    df['chg_7d_num'] = transform_percent_str_to_num(df['chg_7d'])
+    na_list = ['name', 'price_usd_num', 'vol_24h_num', 'market_cap_num', 'total_vol_num', 'chg_24h_num', 'chg_7d_num']
+    df = drop_na_line(df, *na_list)
+
+    # names of dropped lines should not stay in categories
+    df['name'] = df['name'].cat.remove_unused_categories()
+    df['symbol'] = df['symbol'].cat.remove_unused_categories()
+
+    # raw string columns are not used after parsing
+    return df.drop(columns=['price_usd', 'vol_24h', 'market_cap', 'total_vol', 'chg_24h', 'chg_7d'])
+
+
+@st.cache_resource
+def load_crypto_by_name(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Same data as load_crypto_data, but indexed by name and sorted by (name, timestamp),
+    so lines of one crypto are one contiguous block (see get_crypto_rows). Shared like load_crypto_data.
+    :param path, mtime: as in load_crypto_data
+    :returns: pd.DataFrame
+    """
+    df = load_crypto_data(path, mtime)
+    return df.sort_values(['name', 'timestamp']).set_index('name')
+
+
+def get_crypto_rows(df_by_name: pd.DataFrame, crypto, start_datetime, end_datetime) -> pd.DataFrame:
+    """
+    Returns lines of crypto with start_datetime <= timestamp <= end_datetime
+    Uses binary search on sorted name index and timestamps, no masks over the whole dataframe
+    :param df_by_name: dataframe from load_crypto_by_name
+    :returns: pd.DataFrame, sorted by timestamp (may be empty)
+    """
+    if crypto not in df_by_name.index:
+        return df_by_name.iloc[0:0]
+    crypto_df = df_by_name.loc[crypto:crypto]
+
+    lo = crypto_df['timestamp'].searchsorted(start_datetime, side='left')
+    hi = crypto_df['timestamp'].searchsorted(end_datetime, side='right')
+    return crypto_df.iloc[lo:hi]
 
 
 def make_card(func):
@@ -106,77 +164,102 @@ def make_card(func):
 
 
 # --- KPI cards ---
+@st.cache_data
+def load_kpi_stats(path: str, mtime: float) -> dict:
+    """
+    Computes all values shown on KPI cards (cached like load_crypto_data),
+    so cards only format ready values and don't scan the dataframe on each rerun.
+    :param path, mtime: as in load_crypto_data
+    :returns: dict, for top-cards value is (name, number)
+    """
+    df = load_crypto_data(path, mtime)
+
+    def name_and_value(idx, col):
+        return df.at[idx, 'name'], df.at[idx, col]
+
+    return {
+        'count': df['name'].nunique(),
+        'total_market_cap': df['market_cap_num'].sum(),
+        'max_market_cap': name_and_value(df['market_cap_num'].idxmax(), 'market_cap_num'),
+        'most_expensive': name_and_value(df['price_usd_num'].idxmax(), 'price_usd_num'),
+        'top_gainer_24h': name_and_value(df['chg_24h_num'].idxmax(), 'chg_24h_num'),
+        'top_loser_24h': name_and_value(df['chg_24h_num'].idxmin(), 'chg_24h_num'),
+        'top_gainer_7d': name_and_value(df['chg_7d_num'].idxmax(), 'chg_7d_num'),
+        'top_loser_7d': name_and_value(df['chg_7d_num'].idxmin(), 'chg_7d_num'),
+    }
+
 # ----------------- Crypto count
 @make_card
-def card_info(df):
+def card_info(stats):
     title = "Crypto count"
-    count = df['name'].nunique()
+    count = stats['count']
     count_str = f"{count:_}"
     return title, count_str
 
 # ------------------ Total Market Cap
 @make_card
-def total_market_cap(df):
+def total_market_cap(stats):
     title = "Total Market Cap"
-    total = df['market_cap_num'].sum()
+    total = stats['total_market_cap']
     return title, f"${short_format_num(total)}"
 
 # ------------------ Top Market Cap
 @make_card
-def max_market_cap(df):
+def max_market_cap(stats):
     title = "Top Market Cap"
-    row = df.loc[df['market_cap_num'].idxmax()]
-    return title, f"{row['name']} — ${short_format_num(row['market_cap_num'])}"
+    name, value = stats['max_market_cap']
+    return title, f"{name} — ${short_format_num(value)}"
 
 # ------------------ Most Expensive Crypto
 @make_card
-def most_expensive_crypto(df):
+def most_expensive_crypto(stats):
     title = "Most Expensive"
-    row = df.loc[df['price_usd_num'].idxmax()]
-    return title, f"{row['name']} — ${short_format_num(row['price_usd_num'])}"
+    name, value = stats['most_expensive']
+    return title, f"{name} — ${short_format_num(value)}"
 
 # ------------------ Top Gainer (24h)
 @make_card
-def top_gainer_24h(df):
+def top_gainer_24h(stats):
     title = "Top Gainer (24h)"
-    row = df.loc[df['chg_24h_num'].idxmax()]
-    return title, f"{row['name']} — {row['chg_24h_num']:.2f}%"
+    name, value = stats['top_gainer_24h']
+    return title, f"{name} — {value:.2f}%"
 
 # ------------------ Top Loser (24h)
 @make_card
-def top_loser_24h(df):
+def top_loser_24h(stats):
     title = "Top Loser (24h)"
-    row = df.loc[df['chg_24h_num'].idxmin()]
-    return title, f"{row['name']} — {row['chg_24h_num']:.2f}%"
+    name, value = stats['top_loser_24h']
+    return title, f"{name} — {value:.2f}%"
 
 # ------------------ Top Gainer (7d)
 @make_card
-def top_gainer_7d(df):
+def top_gainer_7d(stats):
     title = "Top Gainer (7d)"
-    row = df.loc[df['chg_7d_num'].idxmax()]
-    return title, f"{row['name']} — {row['chg_7d_num']:.2f}%"
+    name, value = stats['top_gainer_7d']
+    return title, f"{name} — {value:.2f}%"
 
 # ------------------ Top Loser (7d)
 @make_card
-def top_loser_7d(df):
+def top_loser_7d(stats):
     title = "Top Loser (7d)"
-    row = df.loc[df['chg_7d_num'].idxmin()]
-    return title, f"{row['name']} — {row['chg_7d_num']:.2f}%"
+    name, value = stats['top_loser_7d']
+    return title, f"{name} — {value:.2f}%"
 
 def short_format_num(num):
     """
     Format large numbers with suffixes:
-    K = thousand, M = million, B = billion, T = trillion
+    K = thousand, M = million, B = billion, T = trillion, P = quadrillion
     """
-    for unit in ["", "K", "M", "B", "T"]:
-        if abs(num) < 1000:
-            return f"{num:.1f}{unit}"
-        num /= 1000
-    return f"{num:.1f}P"
+    if num == 0 or not math.isfinite(num):
+        return f"{num:.1f}"
+    # number of thousands groups -> unit index, no loop
+    idx = min(max(int(math.log10(abs(num)) // 3), 0), 5)
+    return f"{num / 1000 ** idx:.1f}{['', 'K', 'M', 'B', 'T', 'P'][idx]}"
 
 def get_crypto_list(df):
-  #print(df['name'].unique())
-  return df['name'].unique()
+  # name is category (unused ones removed in load_crypto_data) -> no scan of the column
+  # categories are sorted case-sensitively ('BNB' < 'Bitcoin'), sort them for the dropdown case-insensitively
+  return sorted(df['name'].cat.categories, key=str.casefold)
 
 import pandas as pd
 
@@ -192,14 +275,11 @@ def get_top_crypto_list(df, n=10, by="market_cap_num", top1=True):
     if by not in df.columns:
         raise ValueError(f"Column {by!r} not found in dataframe")
 
-    # Create a copy to avoid changing original df
-    tmp = df.copy()
-
-    # Drop rows where name is missing or sorting column is NaN
-    top_names = (tmp.dropna(subset=[by])
-        .sort_values(by=by, ascending=False)
-        .drop_duplicates(subset=["name"])
-        .head(n)["name"].tolist()
+    # max value per crypto (NaNs are skipped), then only n largest - no full sort of df
+    top_names = (df.groupby("name", observed=True)[by]
+        .max()
+        .nlargest(n)
+        .index.tolist()
     )
 
     if top1:
@@ -207,28 +287,34 @@ def get_top_crypto_list(df, n=10, by="market_cap_num", top1=True):
     return top_names
 
 
-def fmt_num(x, dec):
-    """Format numeric x with thousands '_' and dec decimals. Return '-' for NaN."""
-    if x is None or (isinstance(x, float) and math.isnan(x)):
-        return "-"
-    try:
-        return format(x, f"_.{dec}f") + "$"
-    except Exception:
-        return str(x)
-
-def fmt_percent(x, dec):
-    """Format percent-like numbers and append % sign."""
-    if x is None or (isinstance(x, float) and math.isnan(x)):
-        return "-"
-    try:
-        return format(x, f"_.{dec}f") + "%"
-    except Exception:
-        return str(x)
-
-def get_crypto_main_info(df_main, crypto, start_date, end_date, price_decimals=1, change_decimals=1):
+@st.cache_data
+def load_top_crypto_list(path: str, mtime: float, n=10, by="market_cap_num", top1=True) -> list:
+    """
+    Cached get_top_crypto_list for the crypto csv: computed once for every (n, by, top1).
+    The plot of the list is cached too (see render_crypto_field_png).
+    :param path, mtime: as in load_crypto_data
+    :returns: list of names
+    """
+    return get_top_crypto_list(load_crypto_data(path, mtime), n, by, top1)
+
+
+def make_fmt(dec, suffix):
+    """
+    Returns a formatter: numeric x with thousands '_', dec decimals and suffix ('$', '%').
+    The format string is built once here, not on every call. Formatter returns '-' for NaN.
+    """
+    fmt = f"_.{dec}f"
+
+    def fmt_value(x):
+        if x is None or x != x:  # NaN != NaN, works for numpy floats too
+            return "-"
+        return format(x, fmt) + suffix
+    return fmt_value
+
+def get_crypto_main_info(df_by_name, crypto, start_date, end_date, price_decimals=1, change_decimals=1):
   """
   prints basic info about crypto
-  df - dataframe
+  df_by_name - dataframe from load_crypto_by_name
   crypto - name of crypto
   price_decimals - number of decimals for price
   change_decimals - number of decimals for change
@@ -236,15 +322,14 @@ def get_crypto_main_info(df_main, crypto, start_date, end_date, price_decimals=1
   start_datetime = datetime.combine(start_date, datetime.min.time())
   end_datetime = datetime.combine(end_date, datetime.max.time())
 
-  df = df_main[(df_main['timestamp'] >= start_datetime) & (df_main['timestamp'] <= end_datetime)]
-
-  crypto_df = df[df['name'] == crypto]
+  # only lines of this crypto in the date range, no masks over the whole dataframe
+  crypto_df = get_crypto_rows(df_by_name, crypto, start_datetime, end_datetime)
   if crypto_df.empty:
     st.write(f"No data for {crypto!r}")
     return
 
   # get no number fields
-  name = crypto_df['name'].iloc[0]
+  name = crypto
   symbol = crypto_df['symbol'].iloc[0]
 
   # get number fields
@@ -261,72 +346,102 @@ def get_crypto_main_info(df_main, crypto, start_date, end_date, price_decimals=1
   chg7_min = crypto_df['chg_7d_num'].min()
   chg7_max = crypto_df['chg_7d_num'].max()
 
+  fmt_price = make_fmt(price_decimals, "$")
+  fmt_change = make_fmt(change_decimals, "%")
+
   # EXTRACT
   st.write(f"name: {name}")
   st.write(f"symbol: {symbol}")
-  st.text(f"price in $, mean: {fmt_num(price_mean, price_decimals)}")
-  st.text(f"price in $, median: {fmt_num(price_median, price_decimals)}")
-  st.text(f"price in $, min: {fmt_num(price_min, price_decimals)}")
-  st.text(f"price in $, max: {fmt_num(price_max, price_decimals)}")
+  st.text(f"price in $, mean: {fmt_price(price_mean)}")
+  st.text(f"price in $, median: {fmt_price(price_median)}")
+  st.text(f"price in $, min: {fmt_price(price_min)}")
+  st.text(f"price in $, max: {fmt_price(price_max)}")
 
-  st.write(f"change in last 24 hours - mean: {fmt_percent(chg24_mean, change_decimals)}")
-  st.write(f"change in last 24 hours - min: {fmt_percent(chg24_min, change_decimals)}")
-  st.write(f"change in last 24 hours - max: {fmt_percent(chg24_max, change_decimals)}")
+  st.write(f"change in last 24 hours - mean: {fmt_change(chg24_mean)}")
+  st.write(f"change in last 24 hours - min: {fmt_change(chg24_min)}")
+  st.write(f"change in last 24 hours - max: {fmt_change(chg24_max)}")
 
-  st.write(f"change in last 7 days - mean: {fmt_percent(chg7_mean, change_decimals)}")
-  st.write(f"change in last 7 days - min: {fmt_percent(chg7_min, change_decimals)}")
-  st.write(f"change in last 7 days - max: {fmt_percent(chg7_max, change_decimals)}")
+  st.write(f"change in last 7 days - mean: {fmt_change(chg7_mean)}")
+  st.write(f"change in last 7 days - min: {fmt_change(chg7_min)}")
+  st.write(f"change in last 7 days - max: {fmt_change(chg7_max)}")
 
   return
 
 
-def plot_crypto_field(df_main, start_date, end_date, *cryptos, field='price_usd_num', f_name='Price (USD)', figsize=(10, 6)):
+@st.cache_resource
+def get_figure(figsize):
+    """
+    Returns (fig, ax, lock) - one matplotlib Figure for every figsize, created once and reused by all reruns.
+    Callers clear ax before drawing and don't close fig.
+    Figure is shared between sessions, so draw and save it only while holding lock.
+    """
+    fig, ax = plt.subplots(figsize=figsize)
+    return fig, ax, threading.Lock()
+
+
+def plot_crypto_field(df_by_name, start_date, end_date, *cryptos, field='price_usd_num', f_name='Price (USD)', figsize=(10, 6)):
     """
-    Plots the price of cryptos in USD and displays the figure in Streamlit.
-    - df: dataframe with columns 'timestamp', 'name', 'price_usd_num'
+    Plots field (default price in USD) of cryptos and displays the figure in Streamlit.
+    - df_by_name: dataframe from load_crypto_by_name (index 'name', columns 'timestamp' and field)
     - cryptos: one or more crypto names (strings)
+    - field: column to plot, f_name: its label for title and y-axis
     - figsize: tuple for figure size
-    - date_format: optional strftime format for x-axis (e.g. '%Y-%m-%d')
+    - returns PNG bytes of the figure (see render_crypto_field_png), None if there is nothing to plot
     """
     start_datetime = datetime.combine(start_date, datetime.min.time())
     end_datetime = datetime.combine(end_date, datetime.max.time())
 
-    df = df_main[(df_main['timestamp']>=start_datetime) & (df_main['timestamp']<=end_datetime)]
-
-    fig, ax = plt.subplots(figsize=figsize)
-
-    plotted = False
-    for crypto in cryptos:
-        crypto_df = df[df['name'] == crypto]
+    # lines of all cryptos (already sorted by timestamp), plotted with one lineplot call
+    frames = {crypto: get_crypto_rows(df_by_name, crypto, start_datetime, end_datetime) for crypto in cryptos}
+    for crypto, crypto_df in frames.items():
         if crypto_df.empty:
             st.warning(f"No data for {crypto!r}")
-            continue
-        # sort by timestamp
-        crypto_df = crypto_df.sort_values('timestamp')
-        sns.lineplot(x='timestamp', y=field, data=crypto_df, ax=ax, label=crypto)
-        plotted = True
+    plotted = [crypto for crypto, crypto_df in frames.items() if not crypto_df.empty]
 
     if not plotted:
         st.info("No series to plot.")
-        plt.close(fig)
         return None
 
-    ax.set_title(f_name + " — " + ", ".join(cryptos))
-    ax.set_xlabel("Timestamp")
-    ax.set_ylabel(f_name)
-    ax.grid(True, linestyle='--', alpha=0.4)
-    ax.legend(title="Crypto")
+    # only needed columns - they are the cache key of render_crypto_field_png
+    data = pd.concat([frames[crypto] for crypto in plotted]).reset_index()[['timestamp', 'name', field]]
+    title = f_name + " — " + ", ".join(cryptos)
+
+    png = render_crypto_field_png(data, field, f_name, title, plotted, figsize)
+    st.image(png)      # Display in Streamlit
+
+    return png
+
+
+@st.cache_data(max_entries=64)  # ~140 KB per PNG, shared by all sessions -> keep only the last 64 plots
+def render_crypto_field_png(data, field, f_name, title, hue_order, figsize):
+    """
+    Draws the lines of plot_crypto_field and returns the figure as PNG bytes.
+    Cached by Streamlit on (data, field, names, figsize), so the same plot is not redrawn again.
+    - data: dataframe with columns 'timestamp', 'name' and field
+    - hue_order: cryptos to draw, in legend order
+    """
+    fig, ax, lock = get_figure(figsize)
+    buf = io.BytesIO()
+    with lock:
+        ax.clear()
+        # hue_order: only selected cryptos (not all categories of 'name'), in the given order
+        sns.lineplot(x='timestamp', y=field, hue='name', hue_order=hue_order, data=data, ax=ax)
 
-    # rotate x ticks for readability
-    plt.xticks(rotation=30, ha='right')
+        ax.set_title(title)
+        ax.set_xlabel("Timestamp")
+        ax.set_ylabel(f_name)
+        ax.grid(True, linestyle='--', alpha=0.4)
+        ax.get_legend().set_title("Crypto")
 
-    plt.tight_layout()
+        # rotate x ticks for readability (fig may be not the current pyplot figure)
+        plt.setp(ax.get_xticklabels(), rotation=30, ha='right')
 
-    st.pyplot(fig)      # Display in Streamlit
+        fig.tight_layout()
 
-    plt.close(fig)      # close figure to free memory
+        # same settings as st.pyplot uses
+        fig.savefig(buf, format='png', dpi=200, bbox_inches='tight')
 
-    return fig
+    return buf.getvalue()
 
 def count_plot_top_n_by_name(df: pd.DataFrame, col: str, n: int, color='#1f77b4'):
     """
@@ -337,28 +452,51 @@ def count_plot_top_n_by_name(df: pd.DataFrame, col: str, n: int, color='#1f77b4'
         st.error(f"Column {col!r} not found in DataFrame")
         return None
 
-    # get top n
-    top_n = df[col].value_counts().head(n).index
+    # get top n with counts - small series, it is the cache key of render_count_plot_png
+    top_n = df.groupby(col, observed=True, sort=False).size().nlargest(n)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    sns.countplot(
-        data=df[df[col].isin(top_n)],
-        y=col,
-        order=top_n,
-        color=color,
-        ax=ax
-    )
+    png = render_count_plot_png(top_n, col, n, color)
+    st.image(png)      # Display in Streamlit
+    return png
 
-    ax.set_title(f"Top {n} by Count")
-    ax.set_xlabel("Count")
-    ax.set_ylabel(col)
 
-    # labels on bars
-    for container in ax.containers:
-        if isinstance(container, BarContainer):
-            ax.bar_label(container, label_type="center", color="white", fontsize=12)
-
-    fig.tight_layout()
-    st.pyplot(fig)
-    return fig
+@st.cache_data(max_entries=16)
+def render_count_plot_png(counts: pd.Series, col: str, n: int, color='#1f77b4'):
+    """
+    Draws the bars of count_plot_top_n_by_name and returns the figure as PNG bytes.
+    Cached by Streamlit on the counts, so reruns don't redraw it (and don't wait for the figure lock).
+    - counts: count per value of col (index), in bar order
+    """
+    names = counts.index.astype(str).tolist()
+
+    fig, ax, lock = get_figure((12, 6))   # reused figure, not closed here
+    buf = io.BytesIO()
+    with lock:
+        ax.clear()
+
+        # bars of already counted values, same look as sns.countplot
+        sns.barplot(
+            x=counts.to_numpy(),
+            y=names,
+            order=names,
+            orient='h',
+            errorbar=None,
+            color=color,
+            ax=ax
+        )
+
+        ax.set_title(f"Top {n} by Count")
+        ax.set_xlabel("Count")
+        ax.set_ylabel(col)
+
+        # labels on bars
+        for container in ax.containers:
+            if isinstance(container, BarContainer):
+                ax.bar_label(container, label_type="center", color="white", fontsize=12)
+
+        fig.tight_layout()
+
+        # same settings as st.pyplot uses
+        fig.savefig(buf, format='png', dpi=200, bbox_inches='tight')
+
+    return buf.getvalue()